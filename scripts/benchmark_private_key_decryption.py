@@ -0,0 +1,81 @@
+"""
+Compare the cost of asymmetric decryptions, with a cold private key cache (new EscrowApi for each call)
+and during whole container decryptions.
+
+The `cryptography` package (see the "fast_rsa" extra) must be installed, to compare it with PyCryptodome.
+"""
+
+import timeit
+
+from Crypto.Random import get_random_bytes
+
+from wacryptolib.container import LOCAL_ESCROW_MARKER, encrypt_data_into_container, decrypt_data_from_container
+from wacryptolib.encryption import _encrypt_via_rsa_oaep, _decrypt_via_rsa_oaep
+from wacryptolib.escrow import EscrowApi, PRIVATE_KEY_DECRYPTION_ALGOS_REGISTRY
+from wacryptolib.key_generation import load_asymmetric_key_from_pem_bytestring
+from wacryptolib.key_storage import DummyKeyStorage, DummyKeyStoragePool
+from wacryptolib.utilities import generate_uuid0
+
+REPETITIONS = 20
+
+ENCRYPTION_CONF = dict(
+    data_encryption_strata=[
+        dict(
+            data_encryption_algo=data_encryption_algo,
+            key_encryption_strata=[dict(key_encryption_algo="RSA_OAEP", key_escrow=LOCAL_ESCROW_MARKER)],
+            data_signatures=[],
+        )
+        for data_encryption_algo in ("AES_EAX", "CHACHA20_POLY1305", "AES_CBC")
+    ]
+)
+
+
+def _benchmark(label, func):
+    duration_ms = timeit.timeit(func, number=REPETITIONS) / REPETITIONS * 1000
+    print("%-60s %8.2f ms" % (label, duration_ms))
+
+
+def benchmark_cold_private_key_decryption():
+
+    key_storage = DummyKeyStorage()
+    keychain_uid = generate_uuid0()
+    secret = get_random_bytes(32)
+
+    public_key_pem = EscrowApi(key_storage).fetch_public_key(keychain_uid=keychain_uid, key_type="RSA_OAEP")
+    public_key = load_asymmetric_key_from_pem_bytestring(key_pem=public_key_pem, key_type="RSA_OAEP")
+    cipherdict = _encrypt_via_rsa_oaep(plaintext=secret, key_dict=dict(key=public_key))
+
+    def _decrypt_with_new_escrow_api():
+        escrow_api = EscrowApi(key_storage)
+        assert escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict
+        ) == secret
+
+    def _decrypt_with_pycryptodome():
+        private_key_pem = key_storage.get_private_key(keychain_uid=keychain_uid, key_type="RSA_OAEP")
+        private_key = load_asymmetric_key_from_pem_bytestring(key_pem=private_key_pem, key_type="RSA_OAEP")
+        assert _decrypt_via_rsa_oaep(cipherdict=cipherdict, key_dict=dict(key=private_key)) == secret
+
+    key_loading_function = PRIVATE_KEY_DECRYPTION_ALGOS_REGISTRY["RSA_OAEP"]["key_loading_function"]
+    print("RSA_OAEP private key loading function:", key_loading_function.__name__)
+    _benchmark("Cold decryption with PyCryptodome only", _decrypt_with_pycryptodome)
+    _benchmark("Cold decryption with EscrowApi", _decrypt_with_new_escrow_api)
+
+
+def benchmark_container_decryption():
+
+    key_storage_pool = DummyKeyStoragePool()
+    keychain_uid = generate_uuid0()
+    container = encrypt_data_into_container(
+        b"abc", conf=ENCRYPTION_CONF, keychain_uid=keychain_uid, metadata=None, key_storage_pool=key_storage_pool
+    )
+
+    _benchmark(
+        "Decryption of a container with 3 strata using the same keypair",
+        lambda: decrypt_data_from_container(container, key_storage_pool=key_storage_pool),
+    )
+
+
+if __name__ == "__main__":
+    benchmark_cold_private_key_decryption()
+    benchmark_container_decryption()
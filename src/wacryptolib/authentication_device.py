@@ -1,13 +1,30 @@
+import copy
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from sys import platform as sys_platform
 from pathlib import Path
 from pathlib import PurePath
 from typing import Optional
 
 from wacryptolib.authenticator import is_authenticator_initialized, initialize_authenticator, load_authenticator_metadata
+from wacryptolib.utilities import get_metadata_file_path
 
 logger = logging.getLogger(__name__)
 
+MAX_DEVICE_PROBING_WORKERS = 8
+
+DEVICE_METADATA_CACHE_MAX_SIZE = 64
+_device_metadata_cache = OrderedDict()  # LRU mapping authenticator paths to (file signature, metadata) pairs
+_device_metadata_cache_lock = threading.Lock()
+
+_wmi_connections = threading.local()  # COM objects must not be shared between threads
+
+# Platform-specific modules, only imported on first use
+_win32_modules = None  # (pywintypes, win32api, wmi)
+_linux_modules = None  # (pyudev, psutil)
+
 # FIXME regroup all metadata and is_initialized in single "metadata" field
 
 # FIXME change "format" here, bad wording!!!!
@@ -22,9 +39,12 @@ def list_available_authentication_devices():
         - "format" (str): lowercase character string for filesystem type, like "ext2", "fat32" ...
         - "size" (int): filesystem size in bytes
         - "is_initialized" (bool): if the device has been initialized with metadata
-        - "metadata" (dict): None if device is not initialized, else dict with at least "user" (str) and "device_uid" (UUID) attributes.
+        - "metadata" (dict): None if device is not initialized or has corrupted metadata, else dict with at least "user" (str) and "device_uid" (UUID) attributes.
+        - "metadata_error" (str): None, or the description of the error which occurred when loading metadata of an initialized device.
 
     The linux environment has an additional field which is 'partition' (str) e.g. "/dev/sda1".
+
+    Partitions which can't even be probed (e.g. filesystem size or initialization status are unreadable) are skipped, with a warning log.
     """
 
     if sys_platform == "win32":
@@ -32,15 +52,49 @@ def list_available_authentication_devices():
     else:  # Linux, MacOS etc.
         authentication_devices = _list_available_authentication_devices_linux()
 
-    for authentication_device in authentication_devices:
+    def _attach_metadata(authentication_device):
         metadata = None
+        metadata_error = None
         if authentication_device["is_initialized"]:
-            metadata = load_authentication_device_metadata(authentication_device)  #FIXME - might crash concurrently here??
+            try:
+                metadata = load_authentication_device_metadata(authentication_device)
+            except Exception as exc:  # Device stays listed, e.g. so that it can be re-initialized
+                logger.warning("Could not load metadata of device %s: %r", authentication_device["path"], exc)
+                metadata_error = repr(exc)
         authentication_device["metadata"] = metadata
+        authentication_device["metadata_error"] = metadata_error
+        return authentication_device
 
+    authentication_devices = _probe_devices_concurrently(_attach_metadata, authentication_devices)
     return authentication_devices
 
 
+def _probe_devices_concurrently(probe_func, items) -> list:
+    """
+    Apply `probe_func` to each item in a thread pool, since these probes mostly wait for (slow) removable media.
+
+    Order of items is preserved, and items for which the probe raised an exception are logged and skipped.
+    """
+    items = list(items)
+
+    def _probe_or_none(item):
+        try:
+            return probe_func(item)
+        except Exception as exc:
+            logger.warning("Skipping faulty device %s: %r", item, exc)
+            return None
+
+    if len(items) <= 1:  # Not worth a thread pool, especially since device listing is often polled
+        results = [_probe_or_none(item) for item in items]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_DEVICE_PROBING_WORKERS, len(items)), thread_name_prefix="device_probing_worker"
+        ) as executor:
+            results = list(executor.map(_probe_or_none, items))
+
+    return [result for result in results if result is not None]
+
+
 # FIXME deprecated
 def initialize_authentication_device(authentication_device: dict, user: str, extra_metadata: Optional[dict] = None):
     """
@@ -61,6 +115,9 @@ def initialize_authentication_device(authentication_device: dict, user: str, ext
         authenticator_path=authenticator_path, user=user, extra_metadata=extra_metadata
     )
 
+    with _device_metadata_cache_lock:  # Mtime resolution is coarse on FAT filesystems, so don't rely on it
+        _device_metadata_cache.pop(str(authenticator_path), None)
+
     authentication_device["is_initialized"] = True
     authentication_device["metadata"] = metadata
 
@@ -89,22 +146,86 @@ def load_authentication_device_metadata(authentication_device: dict) -> dict:
     (user and device_uid) fields.
 
     Raises `ValueError` or json decoding exceptions if device appears initialized, but has corrupted metadata.
+
+    Parsed metadata is cached as long as the inode, modification/change times and size of the metadata file don't
+    change.
     """
     authenticator_path = _get_authenticator_path(authentication_device)
-    return load_authenticator_metadata(authenticator_path)
+    cache_key = str(authenticator_path)
+
+    try:
+        stat_result = get_metadata_file_path(authenticator_path).stat()
+        file_signature = (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_ctime_ns, stat_result.st_size)
+    except OSError:
+        file_signature = None  # Let load_authenticator_metadata() raise a proper error
+
+    if file_signature is not None:
+        with _device_metadata_cache_lock:
+            cached_entry = _device_metadata_cache.get(cache_key)
+            if cached_entry is not None and cached_entry[0] == file_signature:
+                _device_metadata_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached_entry[1])
+
+    metadata = load_authenticator_metadata(authenticator_path)
+
+    if file_signature is not None:
+        with _device_metadata_cache_lock:
+            _device_metadata_cache[cache_key] = (file_signature, metadata)
+            _device_metadata_cache.move_to_end(cache_key)
+            while len(_device_metadata_cache) > DEVICE_METADATA_CACHE_MAX_SIZE:
+                _device_metadata_cache.popitem(last=False)
+
+    return copy.deepcopy(metadata)  # Callers may modify nested extra metadata
+
+
+def _import_win32_modules():
+    global _win32_modules
+    if _win32_modules is None:
+        import pywintypes  # Import which also helps win32api to load
+        import win32api
+        import wmi
+
+        _win32_modules = (pywintypes, win32api, wmi)
+    return _win32_modules
+
+
+def _import_linux_modules():
+    global _linux_modules
+    if _linux_modules is None:
+        import pyudev
+        import psutil
+
+        _linux_modules = (pyudev, psutil)
+    return _linux_modules
+
+
+def _get_wmi_connection():
+    """Return a WMI connection, created only once per thread since its setup is slow."""
+    wmi = _import_win32_modules()[2]
+
+    wmi_connection = getattr(_wmi_connections, "connection", None)
+    if wmi_connection is None:
+        wmi_connection = _wmi_connections.connection = wmi.WMI()
+    return wmi_connection
 
 
 def _list_available_authentication_devices_win32():
-    import pywintypes  # Import which also helps win32api to load
-    import win32api
-    import wmi
+    pywintypes, win32api, wmi = _import_win32_modules()
+
+    try:
+        return _do_list_available_authentication_devices_win32(
+            wmi_connection=_get_wmi_connection(), pywintypes=pywintypes, win32api=win32api
+        )
+    except (wmi.x_wmi, pywintypes.com_error):
+        _wmi_connections.connection = None  # Connection might be stale, recreate it on next call
+        raise
 
+
+def _do_list_available_authentication_devices_win32(wmi_connection, pywintypes, win32api):
     authentication_device_list = []
-    for drive in wmi.WMI().Win32_DiskDrive():
-        pnp_dev_id = drive.PNPDeviceID.split("\\")
 
-        if pnp_dev_id[0] != "USBSTOR":
-            continue
+    # Filtering is done by WMI itself, instead of instantiating all disk drives
+    for drive in wmi_connection.query("SELECT * FROM Win32_DiskDrive WHERE PNPDeviceID LIKE 'USBSTOR%'"):
 
         for partition in drive.associators("Win32_DiskDriveToDiskPartition"):
             for logical_disk in partition.associators("Win32_LogicalDiskToPartition"):
@@ -121,7 +242,7 @@ def _list_available_authentication_devices_win32():
                     logging.warning("Skipping faulty device %s: %r", device_path, exc)
                     continue
 
-                authentication_device["drive_type"] = pnp_dev_id[0]  # type like 'USBSTOR'
+                authentication_device["drive_type"] = "USBSTOR"
                 authentication_device["path"] = device_path  # E.g. 'E:\\'
                 assert drive.Size, drive.Size
                 authentication_device["size"] = int(partition.Size)  # In bytes
@@ -136,11 +257,9 @@ def _list_available_authentication_devices_win32():
 
 
 def _list_available_authentication_devices_linux():
-    import pyudev
-    import psutil
+    pyudev, psutil = _import_linux_modules()
 
     context = pyudev.Context()
-    authentication_device_list = []
     removable_devices = [
         device
         for device in context.list_devices(subsystem="block", DEVTYPE="disk")
@@ -148,23 +267,19 @@ def _list_available_authentication_devices_linux():
     ]
     logger.debug("Removable pyudev devices found: %s", str(removable_devices))
 
-    removable_devices_partitions = [
+    removable_devices_partitions = {
         device.device_node
         for removable_device in removable_devices
         for device in context.list_devices(subsystem="block", DEVTYPE="partition", parent=removable_device)
-    ]
-    logger.debug("Removable pyudev partitions found: %s", str(removable_devices_partitions))
+    }
+    logger.debug("Removable pyudev partitions found: %s", str(sorted(removable_devices_partitions)))
 
     all_existing_partitions = psutil.disk_partitions()
     logger.debug("All mounted psutil partitions found: %s", str(all_existing_partitions))
 
-    for p in all_existing_partitions:
-
-        if p.device not in removable_devices_partitions:
-            #logger.warning("REJECTED %s", p)
-            continue
-        #logger.warning("FOUND USB %s", p)
+    candidate_partitions = [p for p in all_existing_partitions if p.device in removable_devices_partitions]
 
+    def _probe_partition(p):
         authentication_device = {}
         authentication_device["drive_type"] = "USBSTOR"
         authentication_device["label"] = str(PurePath(p.mountpoint).name)  # E.g: 'UBUNTU 20_0'
@@ -175,8 +290,9 @@ def _list_available_authentication_devices_linux():
         authentication_device["is_initialized"] = is_authentication_device_initialized(
             authentication_device
         )  # E.g False
-        authentication_device_list.append(authentication_device)
+        return authentication_device
 
+    authentication_device_list = _probe_devices_concurrently(_probe_partition, candidate_partitions)
     return authentication_device_list
 
 
@@ -186,6 +186,20 @@ class ContainerBase:
         assert isinstance(key_storage_pool, KeyStoragePoolBase), key_storage_pool
         self._key_storage_pool = key_storage_pool
         self._passphrase_mapper = passphrase_mapper or {}
+        self._escrow_proxies = {}  # Reused, so that escrow APIs can keep their loaded private keys in cache
+
+    def _get_escrow_proxy(self, escrow: dict):
+        """
+        Return an EscrowApi subclass instance (or proxy) depending on the content of `escrow` dict,
+        creating it only on first use.
+        """
+        escrow_id = get_escrow_id(escrow)
+        proxy = self._escrow_proxies.get(escrow_id)
+        if proxy is None:
+            proxy = self._escrow_proxies[escrow_id] = get_escrow_proxy(
+                escrow=escrow, key_storage_pool=self._key_storage_pool
+            )
+        return proxy
 
 
 class ContainerWriter(ContainerBase):  #FIXME rename to ContainerEncryptor
@@ -466,7 +480,7 @@ class ContainerWriter(ContainerBase):  #FIXME rename to ContainerEncryptor
 
         :return: dictionary which contains every data needed to decrypt the ciphered data
         """
-        encryption_proxy = get_escrow_proxy(escrow=escrow, key_storage_pool=self._key_storage_pool)
+        encryption_proxy = self._get_escrow_proxy(escrow)
 
         logger.debug("Generating asymmetric key of type %r", encryption_algo)
         subkey_pem = encryption_proxy.fetch_public_key(keychain_uid=keychain_uid, key_type=encryption_algo)
@@ -553,7 +567,7 @@ class ContainerWriter(ContainerBase):  #FIXME rename to ContainerEncryptor
         message_digest = conf["message_digest"]  # Must have been set before, using message_digest_algo field
         assert message_digest, message_digest
 
-        encryption_proxy = get_escrow_proxy(escrow=conf["signature_escrow"], key_storage_pool=self._key_storage_pool)
+        encryption_proxy = self._get_escrow_proxy(conf["signature_escrow"])
 
         keychain_uid_signature = conf.get("keychain_uid") or keychain_uid
 
@@ -715,7 +729,7 @@ class ContainerReader(ContainerBase):  #FIXME rename to ContainerDecryptor
 
         :return: decypted data as bytes
         """
-        encryption_proxy = get_escrow_proxy(escrow=escrow, key_storage_pool=self._key_storage_pool)
+        encryption_proxy = self._get_escrow_proxy(escrow)
 
         escrow_id = get_escrow_id(escrow)
         passphrases = self._passphrase_mapper.get(escrow_id) or []
@@ -797,7 +811,7 @@ class ContainerReader(ContainerBase):  #FIXME rename to ContainerDecryptor
         message_digest_algo = conf["message_digest_algo"]
         signature_algo = conf["signature_algo"]
         keychain_uid_signature = conf.get("keychain_uid") or keychain_uid
-        encryption_proxy = get_escrow_proxy(escrow=conf["signature_escrow"], key_storage_pool=self._key_storage_pool)
+        encryption_proxy = self._get_escrow_proxy(conf["signature_escrow"])
         public_key_pem = encryption_proxy.fetch_public_key(
             keychain_uid=keychain_uid_signature, key_type=signature_algo, must_exist=True
         )
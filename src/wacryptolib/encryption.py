@@ -193,8 +193,9 @@ def _encrypt_via_rsa_oaep(plaintext: bytes, key_dict: dict) -> dict:
 def _decrypt_via_rsa_oaep(cipherdict: dict, key_dict: dict) -> bytes:
     """Decrypt a bytestring with PKCS#1 RSA OAEP (asymmetric algo).
 
-    :param cipherdict: list of ciphertext chunks
-    :param key_dict: dict with public RSA key object (RSA.RsaKey)
+    :param cipherdict: dict with field `digest_list`, containing ciphertext chunks as bytes-like objects
+        (e.g. memoryview slices over a single buffer)
+    :param key_dict: dict with private RSA key object (RSA.RsaKey)
 
     :return: the decrypted bytestring"""
     key = key_dict["key"]
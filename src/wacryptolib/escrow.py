@@ -1,6 +1,12 @@
+import hashlib
+import hmac
+import inspect
 import logging
+import os
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from typing import Optional, Union, AnyStr, Sequence
 from uuid import UUID
 
@@ -10,16 +16,112 @@ from wacryptolib.key_generation import (
     generate_asymmetric_keypair,
     load_asymmetric_key_from_pem_bytestring,
     SUPPORTED_ASYMMETRIC_KEY_TYPES,
+    encode_passphrase,
 )
 from wacryptolib.key_storage import KeyStorageBase as KeyStorageBase
 from wacryptolib.signature import sign_message
-from wacryptolib.utilities import PeriodicTaskHandler, generate_uuid0
+from wacryptolib.utilities import PeriodicTaskHandler, generate_uuid0, UTF8_ENCODING
 
 logger = logging.getLogger(__name__)
 
 
 MAX_PAYLOAD_LENGTH_FOR_SIGNATURE = 128  # Max 2*SHA512 length
 
+PRIVATE_KEY_CACHE_MAX_SIZE = 128
+
+def _probe_rsa_backend() -> Optional[dict]:
+    """
+    Return the extra keyword arguments to give to `load_pem_private_key()` of the `cryptography` package,
+    or None if no compatible version of this package is installed.
+    """
+    try:
+        from cryptography.hazmat.primitives import serialization
+        load_pem_private_key_signature = inspect.signature(serialization.load_pem_private_key)
+    except (ImportError, ValueError, TypeError):  # Missing package, or uninspectable callable
+        return None
+    parameters = load_pem_private_key_signature.parameters
+    backend_parameter = parameters.get("backend")
+    if backend_parameter is not None and backend_parameter.default is inspect.Parameter.empty:
+        return None  # Versions < 3.1 require an explicit backend argument
+    extra_kwargs = {}
+    if "unsafe_skip_rsa_key_validation" in parameters:
+        # Key validation (primality tests etc.) costs more than a hundred decryptions, and brings nothing for keys
+        # coming from our own key storages; a corrupted key would anyway make OAEP decryption fail.
+        extra_kwargs["unsafe_skip_rsa_key_validation"] = True
+    return extra_kwargs
+
+
+_CRYPTOGRAPHY_PEM_LOADING_KWARGS = _probe_rsa_backend()  # OpenSSL-backed "cryptography" is faster for RSA private keys
+
+
+def _load_rsa_private_key_from_pem_with_cryptography(
+    key_pem: bytes, *, key_type: str, passphrase: Optional[AnyStr] = None
+):
+    """Load a private RSA key, as an object of the `cryptography` package, from a PEM-formatted bytestring.
+
+    Behaves like `load_asymmetric_key_from_pem_bytestring()`, including for raised KeyLoadingErrors.
+
+    :return: key object
+    """
+    from cryptography.hazmat.primitives import serialization
+
+    if isinstance(passphrase, str):
+        passphrase = encode_passphrase(passphrase)
+    try:
+        return serialization.load_pem_private_key(key_pem, password=passphrase, **_CRYPTOGRAPHY_PEM_LOADING_KWARGS)
+    except (ValueError, TypeError) as exc:  # TypeError is raised on presence/absence mismatch of passphrase
+        raise KeyLoadingError(
+            "Failed loading %s key from pem bytestring %s passphrase (%s)"
+            % (key_type, "with" if passphrase else "without", exc)
+        ) from exc
+
+
+def _decrypt_via_rsa_oaep_cryptography(cipherdict: dict, key_dict: dict) -> bytes:
+    """Decrypt a bytestring with PKCS#1 RSA OAEP, using the OpenSSL backend of `cryptography` package.
+
+    Behaves like `_decrypt_via_rsa_oaep()`, including for the messages of raised ValueErrors.
+
+    :param cipherdict: dict with field `digest_list`, containing ciphertext chunks as bytes-like objects
+    :param key_dict: dict with private RSA key object of `cryptography`, see `_load_rsa_private_key_from_pem_with_cryptography()`
+
+    :return: the decrypted bytestring"""
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    private_key = key_dict["key"]
+    key_length_bytes = private_key.key_size // 8
+
+    # Must stay in sync with RSA_OAEP_HASHER of the PyCryptodome implementation
+    oaep_padding = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA512()), algorithm=hashes.SHA512(), label=None)
+
+    decrypted_chunks = []
+    for encrypted_chunk in cipherdict["digest_list"]:
+        if len(encrypted_chunk) != key_length_bytes:
+            raise ValueError("Ciphertext with incorrect length.")
+        if not isinstance(encrypted_chunk, bytes):
+            encrypted_chunk = bytes(encrypted_chunk)  # This backend only accepts real bytes
+        try:
+            decrypted_chunk = private_key.decrypt(encrypted_chunk, oaep_padding)
+        except ValueError:
+            raise ValueError("Incorrect decryption.") from None
+        decrypted_chunks.append(decrypted_chunk)
+    return b"".join(decrypted_chunks)
+
+
+if _CRYPTOGRAPHY_PEM_LOADING_KWARGS is not None:
+    _RSA_OAEP_DECRYPTION_CONF = dict(
+        key_loading_function=_load_rsa_private_key_from_pem_with_cryptography,
+        decryption_function=_decrypt_via_rsa_oaep_cryptography,
+    )
+else:  # pragma: no cover
+    _RSA_OAEP_DECRYPTION_CONF = dict(
+        key_loading_function=load_asymmetric_key_from_pem_bytestring, decryption_function=_decrypt_via_rsa_oaep
+    )
+
+# Maps uppercase asymmetric cipher names to the functions loading (once per cached key) private keys from PEM,
+# and decrypting cipherdicts with these key objects
+PRIVATE_KEY_DECRYPTION_ALGOS_REGISTRY = {"RSA_OAEP": _RSA_OAEP_DECRYPTION_CONF}
+
 
 def generate_asymmetric_keypair_for_storage(
     key_type: str, *, key_storage, keychain_uid: Optional[UUID] = None, passphrase: Optional[AnyStr] = None
@@ -54,6 +156,77 @@ class EscrowApi:
 
     def __init__(self, key_storage: KeyStorageBase):
         self._key_storage = key_storage
+        # LRU mapping (compact keychain_uid, uppercase key_type, key loading function) to (passphrase digest,
+        # private_key) pairs of deserialized keys; it only helps long-lived instances (e.g. those of webservices,
+        # or those reused by a ContainerReader/ContainerWriter), and keeps decrypted keys in memory until eviction
+        # or clear_private_key_cache()
+        self._private_key_cache = OrderedDict()
+        self._private_key_cache_lock = threading.Lock()
+        self._passphrase_digest_key = os.urandom(32)  # Passphrases are never kept in clear
+
+    @staticmethod
+    def _uid_key(keychain_uid):
+        """Return the compact form of a keychain uid, for use in cache keys."""
+        return keychain_uid.bytes if isinstance(keychain_uid, uuid.UUID) else keychain_uid
+
+    def _get_passphrase_digest(self, passphrase: AnyStr) -> bytes:
+        if isinstance(passphrase, str):
+            passphrase = passphrase.encode(UTF8_ENCODING)
+        return hmac.new(self._passphrase_digest_key, passphrase, hashlib.sha256).digest()
+
+    def clear_private_key_cache(self):
+        """Forget all the private key objects loaded so far by this instance."""
+        with self._private_key_cache_lock:
+            self._private_key_cache.clear()
+
+    def _get_loaded_private_key(
+        self,
+        *,
+        keychain_uid: uuid.UUID,
+        key_type: str,
+        passphrases: Optional[list] = None,
+        key_loading_function=load_asymmetric_key_from_pem_bytestring,
+    ):
+        """
+        Return the private key object for these identifiers, deserializing it from key storage only on cache miss.
+
+        `key_loading_function` must have the signature of `load_asymmetric_key_from_pem_bytestring()`.
+
+        A cached key which was protected by a passphrase is only returned if this exact passphrase is provided again.
+        """
+        passphrases = passphrases or []
+        assert isinstance(passphrases, (tuple, list)), repr(passphrases)
+        cache_key = (self._uid_key(keychain_uid), key_type.upper(), key_loading_function)
+
+        with self._private_key_cache_lock:
+            cached_entry = self._private_key_cache.get(cache_key)
+            if cached_entry is not None:
+                self._private_key_cache.move_to_end(cache_key)
+
+        if cached_entry is not None:
+            passphrase_digest, private_key = cached_entry
+            if passphrase_digest is None or any(
+                hmac.compare_digest(passphrase_digest, self._get_passphrase_digest(passphrase))
+                for passphrase in passphrases
+            ):
+                return private_key
+
+        # Storage access and key decryption might be slow, so they are done outside the lock
+        private_key_pem = self._key_storage.get_private_key(keychain_uid=keychain_uid, key_type=key_type)
+        passphrase, private_key = self._load_private_key_pem_with_passphrases(
+            private_key_pem=private_key_pem,
+            key_type=key_type,
+            passphrases=list(passphrases),
+            key_loading_function=key_loading_function,
+        )
+        passphrase_digest = None if passphrase is None else self._get_passphrase_digest(passphrase)
+
+        with self._private_key_cache_lock:
+            self._private_key_cache[cache_key] = (passphrase_digest, private_key)
+            self._private_key_cache.move_to_end(cache_key)
+            while len(self._private_key_cache) > PRIVATE_KEY_CACHE_MAX_SIZE:
+                self._private_key_cache.popitem(last=False)
+        return private_key
 
     def _ensure_keypair_exists(self, keychain_uid: uuid.UUID, key_type: str):
         """Create a keypair if it doesn't exist."""
@@ -71,6 +244,11 @@ class EscrowApi:
             generate_asymmetric_keypair_for_storage(
                 key_type=key_type, key_storage=self._key_storage, keychain_uid=keychain_uid, passphrase=None
             )
+        keypair_identifiers = (self._uid_key(keychain_uid), key_type.upper())
+        with self._private_key_cache_lock:
+            for cache_key in list(self._private_key_cache):  # Drop any stale entry for this new keypair
+                if cache_key[:2] == keypair_identifiers:
+                    del self._private_key_cache[cache_key]
 
     def fetch_public_key(self, *, keychain_uid: uuid.UUID, key_type: str, must_exist: bool = False) -> bytes:
         """
@@ -97,9 +275,7 @@ class EscrowApi:
 
         self._ensure_keypair_exists(keychain_uid=keychain_uid, key_type=signature_algo)
 
-        private_key_pem = self._key_storage.get_private_key(keychain_uid=keychain_uid, key_type=signature_algo)
-
-        private_key = load_asymmetric_key_from_pem_bytestring(key_pem=private_key_pem, key_type=signature_algo)
+        private_key = self._get_loaded_private_key(keychain_uid=keychain_uid, key_type=signature_algo)
 
         signature = sign_message(message=message, signature_algo=signature_algo, key=private_key)
         return signature
@@ -108,24 +284,40 @@ class EscrowApi:
         """raises a proper exception if authorization is not given yet to decrypt with this keypair."""
         return  # In this base implementation we always allow decryption!
 
-    def _decrypt_private_key_pem_with_passphrases(
-        self, *, private_key_pem: bytes, key_type: str, passphrases: Optional[list]
-    ):
+    def _load_private_key_pem_with_passphrases(
+        self,
+        *,
+        private_key_pem: bytes,
+        key_type: str,
+        passphrases: Optional[list],
+        key_loading_function=load_asymmetric_key_from_pem_bytestring,
+    ) -> tuple:
         """
         Attempt decryption of key with and without provided passphrases, and raise if all fail.
+
+        Returns a (passphrase, key_obj) tuple, where passphrase is None if the key wasn't protected.
         """
         for passphrase in [None] + passphrases:
             try:
-                key_obj = load_asymmetric_key_from_pem_bytestring(
-                    key_pem=private_key_pem, key_type=key_type, passphrase=passphrase
-                )
-                return key_obj
+                key_obj = key_loading_function(key_pem=private_key_pem, key_type=key_type, passphrase=passphrase)
+                return passphrase, key_obj
             except KeyLoadingError:
                 pass
         raise DecryptionError(
             "Could not decrypt private key of type %s (passphrases provided: %d)" % (key_type, len(passphrases))
         )
 
+    def _decrypt_private_key_pem_with_passphrases(
+        self, *, private_key_pem: bytes, key_type: str, passphrases: Optional[list]
+    ):
+        """
+        Attempt decryption of key with and without provided passphrases, and raise if all fail.
+        """
+        passphrase, key_obj = self._load_private_key_pem_with_passphrases(
+            private_key_pem=private_key_pem, key_type=key_type, passphrases=passphrases
+        )
+        return key_obj
+
     def request_decryption_authorization(
         self, keypair_identifiers: Sequence, request_message: str, passphrases: Optional[Sequence] = None
     ) -> dict:
@@ -207,20 +399,35 @@ class EscrowApi:
 
         Raises if key existence, authorization or passphrase errors occur.
         """
-        assert encryption_algo.upper() == "RSA_OAEP"  # Only supported asymmetric cipher for now
+        decryption_conf = PRIVATE_KEY_DECRYPTION_ALGOS_REGISTRY.get(encryption_algo.upper())
+        if decryption_conf is None:
+            raise ValueError("Unknown asymmetric cipher type '%s'" % encryption_algo)
 
         passphrases = passphrases or []
         assert isinstance(passphrases, (tuple, list)), repr(passphrases)
 
-        private_key_pem = self._key_storage.get_private_key(keychain_uid=keychain_uid, key_type=encryption_algo)
-
-        private_key = self._decrypt_private_key_pem_with_passphrases(
-            private_key_pem=private_key_pem, key_type=encryption_algo, passphrases=passphrases
+        private_key = self._get_loaded_private_key(
+            keychain_uid=keychain_uid,
+            key_type=encryption_algo,
+            passphrases=passphrases,
+            key_loading_function=decryption_conf["key_loading_function"],
         )
 
-        secret = _decrypt_via_rsa_oaep(cipherdict=cipherdict, key_dict=dict(key=private_key))
+        secret = decryption_conf["decryption_function"](cipherdict=cipherdict, key_dict=dict(key=private_key))
         return secret
 
+    def batch_decrypt(self, decryption_requests: Sequence) -> list:
+        """
+        Decrypt several cipherdicts in a single call, e.g. symmetric keys of many containers.
+
+        This relies on the private key cache of this instance, so a key used by several requests is usually only
+        loaded once; errors are raised like in `decrypt_with_private_key()`, interrupting the batch.
+
+        :param decryption_requests: list of dicts with the same fields as `decrypt_with_private_key()` parameters
+        :return: list of decrypted bytestrings, in the same order as requests
+        """
+        return [self.decrypt_with_private_key(**decryption_request) for decryption_request in decryption_requests]
+
 
 class ReadonlyEscrowApi(EscrowApi):
     """
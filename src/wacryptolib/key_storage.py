@@ -4,6 +4,7 @@ import logging
 import os
 import random
 import re
+import sys
 import threading
 import uuid
 from abc import ABC, abstractmethod
@@ -40,7 +41,7 @@ class KeyStorageBase(ABC):
         :param public_key: public key in clear PEM format
         :param private_key: private key in PEM format (potentially encrypted)
         """
-        raise NotImplementedError("KeyStorageBase.set_keys()")
+        ...
 
     @abstractmethod
     def get_public_key(self, *, keychain_uid: uuid.UUID, key_type: str) -> bytes:  # pragma: no cover
@@ -52,7 +53,7 @@ class KeyStorageBase(ABC):
 
         :return: public key in clear PEM format, or raise KeyDoesNotExist
         """
-        raise NotImplementedError("KeyStorageBase.get_public_key()")
+        ...
 
     @abstractmethod
     def get_private_key(self, *, keychain_uid: uuid.UUID, key_type: str) -> bytes:  # pragma: no cover
@@ -64,7 +65,7 @@ class KeyStorageBase(ABC):
 
         :return: private key in PEM format (potentially encrypted), or raise KeyDoesNotExist
         """
-        raise NotImplementedError("KeyStorageBase.get_private_key()")
+        ...
 
     @abstractmethod
     def get_free_keypairs_count(self, key_type: str) -> int:  # pragma: no cover
@@ -74,7 +75,7 @@ class KeyStorageBase(ABC):
         :param key_type: one of SUPPORTED_ASYMMETRIC_KEY_TYPES
         :return: count of free keypairs of said type
         """
-        raise NotImplementedError("KeyStorageBase.get_free_keypairs_count()")
+        ...
 
     @abstractmethod
     def add_free_keypair(self, *, key_type: str, public_key: bytes, private_key: bytes):  # pragma: no cover
@@ -85,7 +86,7 @@ class KeyStorageBase(ABC):
         :param public_key: public key in clear PEM format
         :param private_key: private key in PEM format (potentially encrypted)
         """
-        raise NotImplementedError("KeyStorageBase.add_free_keypair()")
+        ...
 
     @abstractmethod
     def attach_free_keypair_to_uuid(self, *, keychain_uid: uuid.UUID, key_type: str):  # pragma: no cover
@@ -98,7 +99,7 @@ class KeyStorageBase(ABC):
         :param key_type: one of SUPPORTED_ASYMMETRIC_KEY_TYPES
         :return: public key of the keypair, in clear PEM format
         """
-        raise NotImplementedError("KeyStorageBase.attach_free_keypair_to_uuid()")
+        ...
 
 
 class DummyKeyStorage(KeyStorageBase):
@@ -109,24 +110,34 @@ class DummyKeyStorage(KeyStorageBase):
     """
 
     def __init__(self):
-        self._cached_keypairs = {}  # Maps (keychain_uid, key_type) to dicts of public_key/private_key
+        # Both map normalized (keychain_uid, key_type) identifiers to PEM keys
+        self._public_keys = {}
+        self._private_keys = {}
         self._free_keypairs = {}  # Maps key types to lists of dicts of public_key/private_key
 
-    def _get_keypair_or_none(self, *, keychain_uid, key_type):
-        return self._cached_keypairs.get((keychain_uid, key_type))
-
-    def _get_keypair_or_raise(self, *, keychain_uid, key_type):
-        keypair = self._get_keypair_or_none(keychain_uid=keychain_uid, key_type=key_type)
-        if keypair:
-            return keypair
+    @staticmethod
+    def _make_key(keychain_uid, key_type):
+        """Return a compact dict key for these identifiers (UUIDs are replaced by their 16-bytes form)."""
+        if isinstance(keychain_uid, uuid.UUID):
+            keychain_uid = keychain_uid.bytes
+        if isinstance(key_type, str):
+            key_type = sys.intern(key_type)
+        return (keychain_uid, key_type)
+
+    def _get_key_or_raise(self, keys_dict, *, keychain_uid, key_type):
+        key = keys_dict.get(self._make_key(keychain_uid, key_type))
+        if key is not None:
+            return key
         raise KeyDoesNotExist("Dummy keypair %s/%s not found" % (keychain_uid, key_type))
 
     def _set_keypair(self, *, keychain_uid, key_type, keypair):
         assert isinstance(keypair, dict), keypair
-        self._cached_keypairs[(keychain_uid, key_type)] = keypair
+        key = self._make_key(keychain_uid, key_type)
+        self._public_keys[key] = keypair["public_key"]
+        self._private_keys[key] = keypair["private_key"]
 
     def _check_keypair_does_not_exist(self, keychain_uid, key_type):
-        if self._get_keypair_or_none(keychain_uid=keychain_uid, key_type=key_type):
+        if self._make_key(keychain_uid, key_type) in self._public_keys:
             raise KeyAlreadyExists("Already existing dummy keypair %s/%s" % (keychain_uid, key_type))
 
     def set_keys(self, *, keychain_uid, key_type, public_key, private_key):
@@ -136,12 +147,10 @@ class DummyKeyStorage(KeyStorageBase):
         )
 
     def get_public_key(self, *, keychain_uid, key_type):
-        keypair = self._get_keypair_or_raise(keychain_uid=keychain_uid, key_type=key_type)
-        return keypair["public_key"]
+        return self._get_key_or_raise(self._public_keys, keychain_uid=keychain_uid, key_type=key_type)
 
     def get_private_key(self, *, keychain_uid, key_type):
-        keypair = self._get_keypair_or_raise(keychain_uid=keychain_uid, key_type=key_type)
-        return keypair["private_key"]
+        return self._get_key_or_raise(self._private_keys, keychain_uid=keychain_uid, key_type=key_type)
 
     def get_free_keypairs_count(self, key_type):
         return len(self._free_keypairs.get(key_type, []))
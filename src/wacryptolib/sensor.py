@@ -3,6 +3,7 @@ import logging
 import tarfile
 import threading
 from datetime import datetime, timezone
+from typing import Union
 
 from wacryptolib.container import ContainerStorage, CONTAINER_DATETIME_FORMAT
 from wacryptolib.utilities import (
@@ -47,6 +48,23 @@ class TimeLimitedAggregatorMixin:
         self._current_start_time = None
 
 
+class _BytesLikeReader:
+    """
+    Minimal readable file-like object over a bytes-like object, which returns memoryview
+    slices instead of copying data (unlike io.BytesIO, for non-bytes inputs).
+    """
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    def read(self, size=-1):
+        start = self._position
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._position = end
+        return self._view[start:end]
+
+
 class TarfileRecordsAggregator(TimeLimitedAggregatorMixin):
     """
     This class allows sensors to aggregate file-like records of data in memory.
@@ -128,7 +146,14 @@ class TarfileRecordsAggregator(TimeLimitedAggregatorMixin):
         return filename
 
     @synchronized
-    def add_record(self, sensor_name: str, from_datetime: datetime, to_datetime: datetime, extension: str, data: bytes):
+    def add_record(
+        self,
+        sensor_name: str,
+        from_datetime: datetime,
+        to_datetime: datetime,
+        extension: str,
+        data: Union[bytes, bytearray, memoryview],
+    ):
         """Add the provided data to the tarfile, using associated metadata.
 
         If, despite included timestamps, several records end up having the exact same name, the last one will have
@@ -138,15 +163,25 @@ class TarfileRecordsAggregator(TimeLimitedAggregatorMixin):
         :param from_datetime: start time of the recording
         :param to_datetime: end time of the recording
         :param extension: file extension, starting with a dot
-        :param data: bytestring of audio/video/other data
+        :param data: bytes-like object of audio/video/other data (memoryviews, which must be C-contiguous,
+                     are not copied before being written)
         """
         assert self._current_records_count or not self._current_start_time  # INVARIANT of our system!
-        assert isinstance(data, bytes), repr(data)  # For now, only format supported
+        assert isinstance(data, (bytes, bytearray, memoryview)), repr(data)
+        assert not isinstance(data, memoryview) or data.c_contiguous, data  # Else it can't be cast to a flat view
         assert extension.startswith("."), extension
         assert from_datetime <= to_datetime, (from_datetime, to_datetime)
         check_datetime_is_tz_aware(from_datetime)
         check_datetime_is_tz_aware(to_datetime)
 
+        # Prepared before any change of aggregator state, so that errors leave it consistent
+        if isinstance(data, bytes):
+            fileobj = io.BytesIO(data)  # Does NOT copy data until write, since Python3.5
+            data_size = len(data)
+        else:
+            fileobj = _BytesLikeReader(data)  # Tarfile then writes data by chunks, straight from the original buffer
+            data_size = memoryview(data).nbytes
+
         self._notify_aggregation_operation()
 
         filename = self._build_record_filename(
@@ -156,15 +191,13 @@ class TarfileRecordsAggregator(TimeLimitedAggregatorMixin):
 
         mtime = to_datetime.timestamp()
 
-        member_metadata = dict(size=len(data), mtime=to_datetime)
+        member_metadata = dict(size=data_size, mtime=to_datetime)
         self._current_metadata["members"][filename] = member_metadata  # Overridden if existing
 
         tarinfo = tarfile.TarInfo(filename)
-        tarinfo.size = len(data)  # this is crucial
+        tarinfo.size = data_size  # this is crucial
         tarinfo.mtime = mtime
 
-        fileobj = io.BytesIO(data)  # Does NOT copy data until write, since Python3.5
-
         # Memory warning : duplicates data to bytesio tarfile
         self._current_tarfile.addfile(tarinfo, fileobj=fileobj)  
 
@@ -1,7 +1,12 @@
+import os
+import shutil
 from pathlib import Path
 from uuid import UUID
 
+import pytest
+
 from _test_mockups import get_fake_authentication_device
+import wacryptolib.authentication_device
 from wacryptolib.authentication_device import (
     list_available_authentication_devices,
     is_authentication_device_initialized,
@@ -41,6 +46,58 @@ def test_list_available_authentication_devices():  # FIXME add mockups to simula
             assert isinstance(authentication_device["metadata"]["device_uid"], (type(None), UUID))  # Might be empty
 
 
+def test_list_available_authentication_devices_with_faulty_metadata(tmp_path, monkeypatch):
+
+    fake_devices = []
+    for idx in range(5):
+        device_path = tmp_path / ("device%d" % idx)
+        device_path.mkdir()
+        authentication_device = get_fake_authentication_device(device_path)
+        if idx % 2:
+            initialize_authentication_device(authentication_device, user="User%d" % idx)
+        fake_devices.append(authentication_device)
+
+    faulty_device = fake_devices[3]
+    get_metadata_file_path(_get_authenticator_path(faulty_device)).write_text("ZJSJS")
+
+    platform_listing_function = (
+        "_list_available_authentication_devices_win32"
+        if wacryptolib.authentication_device.sys_platform == "win32"
+        else "_list_available_authentication_devices_linux"
+    )
+    monkeypatch.setattr(
+        wacryptolib.authentication_device, platform_listing_function, lambda: [dict(d, metadata="BAD") for d in fake_devices]
+    )
+
+    authentication_devices_list = list_available_authentication_devices()
+
+    # Faulty device is still listed, and all devices keep their order
+    assert [d["path"] for d in authentication_devices_list] == [d["path"] for d in fake_devices]
+    for authentication_device in authentication_devices_list:
+        if authentication_device["path"] == faulty_device["path"]:
+            assert authentication_device["is_initialized"]
+            assert authentication_device["metadata"] is None
+            assert authentication_device["metadata_error"]
+        elif authentication_device["is_initialized"]:
+            assert authentication_device["metadata"]["user"].startswith("User")
+            assert authentication_device["metadata_error"] is None
+        else:
+            assert authentication_device["metadata"] is None
+            assert authentication_device["metadata_error"] is None
+
+    # Single devices are probed without thread pool
+    monkeypatch.setattr(
+        wacryptolib.authentication_device, platform_listing_function, lambda: [dict(fake_devices[1])]
+    )
+    monkeypatch.setattr(wacryptolib.authentication_device, "ThreadPoolExecutor", None)
+    authentication_devices_list = list_available_authentication_devices()
+    assert len(authentication_devices_list) == 1
+    assert authentication_devices_list[0]["metadata"]["user"] == "User1"
+
+    monkeypatch.setattr(wacryptolib.authentication_device, platform_listing_function, lambda: [])
+    assert list_available_authentication_devices() == []
+
+
 def test_authentication_device_initialization_and_checkers(tmp_path):
 
     authentication_device = get_fake_authentication_device(tmp_path)
@@ -99,3 +156,53 @@ def test_authentication_device_initialization_and_checkers(tmp_path):
     assert metadata["user"] == "Johnny"
     assert isinstance(metadata["device_uid"], UUID)
     assert metadata["passphrase_hint"] == "big passphrâse \n aboùt bïrds"
+
+
+def test_authentication_device_metadata_cache(tmp_path, monkeypatch):
+
+    authentication_device = get_fake_authentication_device(tmp_path)
+    initialize_authentication_device(authentication_device, user="Jean", extra_metadata=dict(tags=["important"]))
+    metadata_file_path = get_metadata_file_path(_get_authenticator_path(authentication_device))
+
+    metadata_loadings = []
+    original_load_authenticator_metadata = wacryptolib.authentication_device.load_authenticator_metadata
+
+    def load_authenticator_metadata(authenticator_path):
+        metadata_loadings.append(authenticator_path)
+        return original_load_authenticator_metadata(authenticator_path)
+
+    monkeypatch.setattr(wacryptolib.authentication_device, "load_authenticator_metadata", load_authenticator_metadata)
+
+    for _ in range(3):
+        metadata = load_authentication_device_metadata(authentication_device)
+        assert metadata["user"] == "Jean"
+        assert metadata["tags"] == ["important"]
+        metadata["user"] = "Modified"  # Must not pollute the cache
+        metadata["tags"].append("modified")
+    assert len(metadata_loadings) == 1
+
+    # Rewriting the file invalidates the cache entry
+    metadata_file_path.write_text(metadata_file_path.read_text().replace("Jean", "Jeanne"))
+    stat_result = metadata_file_path.stat()
+    os.utime(metadata_file_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+
+    metadata = load_authentication_device_metadata(authentication_device)
+    assert metadata["user"] == "Jeanne"
+    assert len(metadata_loadings) == 2
+
+    # Re-initializing a wiped device invalidates the cache entry, even if file times and size are unchanged
+    stat_result = metadata_file_path.stat()
+    shutil.rmtree(_get_authenticator_path(authentication_device))
+    authentication_device["is_initialized"] = False
+    initialize_authentication_device(authentication_device, user="Jeanot", extra_metadata=dict(tags=["important"]))
+    assert metadata_file_path.stat().st_size == stat_result.st_size
+    os.utime(metadata_file_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+    new_metadata = load_authentication_device_metadata(authentication_device)
+    assert new_metadata["user"] == "Jeanot"
+    assert new_metadata["device_uid"] != metadata["device_uid"]
+    assert len(metadata_loadings) == 3
+
+    metadata_file_path.unlink()
+    with pytest.raises(FileNotFoundError):
+        load_authentication_device_metadata(authentication_device)
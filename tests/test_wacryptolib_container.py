@@ -335,7 +335,7 @@ def test_standard_container_encryption_and_decryption(tmp_path, container_conf,
     if keychain_uid:
         assert container["keychain_uid"] == keychain_uid
 
-    local_keypair_identifiers = key_storage_pool.get_local_key_storage()._cached_keypairs
+    local_keypair_identifiers = key_storage_pool.get_local_key_storage()._public_keys
     print(">>> Test local_keypair_identifiers ->", list(local_keypair_identifiers.keys()))
 
     escrow_dependencies = gather_escrow_dependencies(containers=[container])
@@ -702,6 +702,47 @@ def test_get_proxy_for_escrow(tmp_path):
             get_escrow_proxy(dict(urn="athena"), container_base._key_storage_pool)
 
 
+def test_escrow_proxies_reused_by_container_reader():
+
+    key_storage_pool = DummyKeyStoragePool()
+    local_key_storage = key_storage_pool.get_local_key_storage()
+
+    container_base = ContainerBase(key_storage_pool=key_storage_pool)
+    proxy = container_base._get_escrow_proxy(LOCAL_ESCROW_MARKER)
+    assert isinstance(proxy, EscrowApi)
+    assert container_base._get_escrow_proxy(copy.deepcopy(LOCAL_ESCROW_MARKER)) is proxy
+    assert ContainerBase(key_storage_pool=key_storage_pool)._get_escrow_proxy(LOCAL_ESCROW_MARKER) is not proxy
+
+    container_conf = dict(
+        data_encryption_strata=[
+            dict(
+                data_encryption_algo=data_encryption_algo,
+                key_encryption_strata=[dict(key_encryption_algo="RSA_OAEP", key_escrow=LOCAL_ESCROW_MARKER)],
+                data_signatures=[],
+            )
+            for data_encryption_algo in ("AES_EAX", "AES_CBC", "CHACHA20_POLY1305")
+        ]
+    )
+    data = b"abc"
+    container = encrypt_data_into_container(
+        data, conf=container_conf, keychain_uid=generate_uuid0(), metadata=None, key_storage_pool=key_storage_pool
+    )
+
+    private_key_fetches = []
+    original_get_private_key = local_key_storage.get_private_key
+
+    def get_private_key(**kwargs):
+        private_key_fetches.append(kwargs)
+        return original_get_private_key(**kwargs)
+
+    local_key_storage.get_private_key = get_private_key
+
+    # All strata use the same keypair, which is thus only loaded once
+    result_data = decrypt_data_from_container(container, key_storage_pool=key_storage_pool)
+    assert result_data == data
+    assert len(private_key_fetches) == 1
+
+
 def test_container_storage_and_executor(tmp_path, caplog):
 
     side_tmp = tmp_path / "side_tmp"
@@ -5,8 +5,11 @@ import copy
 import pytest
 from Crypto.Random import get_random_bytes
 
-from wacryptolib.encryption import _encrypt_via_rsa_oaep
+import wacryptolib.escrow
+from wacryptolib.encryption import _encrypt_via_rsa_oaep, _decrypt_via_rsa_oaep
 from wacryptolib.escrow import (
+    _decrypt_via_rsa_oaep_cryptography,
+    _load_rsa_private_key_from_pem_with_cryptography,
     EscrowApi,
     generate_free_keypair_for_least_provisioned_key_type,
     get_free_keys_generator_worker,
@@ -18,7 +21,7 @@ from wacryptolib.key_generation import (
     SUPPORTED_ASYMMETRIC_KEY_TYPES,
     generate_asymmetric_keypair,
 )
-from wacryptolib.exceptions import KeyDoesNotExist, SignatureVerificationError, DecryptionError
+from wacryptolib.exceptions import KeyDoesNotExist, SignatureVerificationError, DecryptionError, KeyLoadingError
 from wacryptolib.key_storage import DummyKeyStorage
 from wacryptolib.signature import verify_message_signature
 from wacryptolib.utilities import generate_uuid0
@@ -248,6 +251,256 @@ def test_readonly_escrow_api_behaviour():
     assert decrypted == secret
 
 
+def _build_escrow_api_with_rsa_oaep_cipherdicts():
+    """
+    Build an EscrowApi with two RSA_OAEP keypairs (one protected by a passphrase) and a secret encrypted with both.
+
+    The returned list of private key fetches is filled on each access to the key storage of this EscrowApi.
+    """
+    key_storage = DummyKeyStorage()
+    escrow_api = EscrowApi(key_storage=key_storage)
+
+    keychain_uid = generate_uuid0()
+    keychain_uid_passphrased = generate_uuid0()
+    good_passphrase = "good_passphrase"
+    secret = get_random_bytes(40)
+
+    public_key_pem = escrow_api.fetch_public_key(keychain_uid=keychain_uid, key_type="RSA_OAEP")
+    keypair_passphrased = generate_asymmetric_keypair_for_storage(
+        key_type="RSA_OAEP", key_storage=key_storage, keychain_uid=keychain_uid_passphrased, passphrase=good_passphrase
+    )
+
+    cipherdict = _encrypt_via_rsa_oaep(
+        plaintext=secret,
+        key_dict=dict(key=load_asymmetric_key_from_pem_bytestring(key_pem=public_key_pem, key_type="RSA_OAEP")),
+    )
+    cipherdict_passphrased = _encrypt_via_rsa_oaep(
+        plaintext=secret,
+        key_dict=dict(
+            key=load_asymmetric_key_from_pem_bytestring(key_pem=keypair_passphrased["public_key"], key_type="RSA_OAEP")
+        ),
+    )
+
+    private_key_fetches = []
+    original_get_private_key = key_storage.get_private_key
+
+    def get_private_key(**kwargs):
+        private_key_fetches.append(kwargs)
+        return original_get_private_key(**kwargs)
+
+    key_storage.get_private_key = get_private_key
+
+    return (
+        escrow_api,
+        private_key_fetches,
+        keychain_uid,
+        keychain_uid_passphrased,
+        good_passphrase,
+        secret,
+        cipherdict,
+        cipherdict_passphrased,
+    )
+
+
+def test_escrow_api_private_key_cache(monkeypatch):
+
+    (
+        escrow_api,
+        private_key_fetches,
+        keychain_uid,
+        keychain_uid_passphrased,
+        good_passphrase,
+        secret,
+        cipherdict,
+        cipherdict_passphrased,
+    ) = _build_escrow_api_with_rsa_oaep_cipherdicts()
+
+    for _ in range(3):
+        decrypted = escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict
+        )
+        assert decrypted == secret
+    assert len(private_key_fetches) == 1
+
+    decrypted = escrow_api.decrypt_with_private_key(
+        keychain_uid=keychain_uid, encryption_algo="rsa_oaep", cipherdict=cipherdict
+    )
+    assert decrypted == secret
+    assert len(private_key_fetches) == 1  # Cache keys are case-insensitive, like algorithm names
+
+    for _ in range(2):
+        decrypted = escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid_passphrased,
+            encryption_algo="RSA_OAEP",
+            cipherdict=cipherdict_passphrased,
+            passphrases=[good_passphrase],
+        )
+        assert decrypted == secret
+    assert len(private_key_fetches) == 2
+
+    # A cached passphrase-protected key is NOT usable without its passphrase
+    with pytest.raises(DecryptionError, match="not decrypt"):
+        escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid_passphrased, encryption_algo="RSA_OAEP", cipherdict=cipherdict_passphrased
+        )
+    assert len(private_key_fetches) == 3
+
+    # Only exact passphrases match, and they are not stored in clear
+    with pytest.raises(DecryptionError, match="not decrypt"):
+        escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid_passphrased,
+            encryption_algo="RSA_OAEP",
+            cipherdict=cipherdict_passphrased,
+            passphrases=["zz" + good_passphrase + "zz"],
+        )
+    with pytest.raises(AssertionError):
+        escrow_api._get_loaded_private_key(
+            keychain_uid=keychain_uid_passphrased, key_type="RSA_OAEP", passphrases="zz" + good_passphrase + "zz"
+        )
+    for passphrase_digest, _private_key in escrow_api._private_key_cache.values():
+        assert passphrase_digest != good_passphrase.encode("utf8")
+
+    escrow_api.clear_private_key_cache()
+    decrypted = escrow_api.decrypt_with_private_key(
+        keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict
+    )
+    assert decrypted == secret
+    assert len(private_key_fetches) == 5
+
+    # Cache is bounded, least recently used keys are dropped first
+    monkeypatch.setattr(wacryptolib.escrow, "PRIVATE_KEY_CACHE_MAX_SIZE", 1)
+    escrow_api.decrypt_with_private_key(
+        keychain_uid=keychain_uid_passphrased,
+        encryption_algo="RSA_OAEP",
+        cipherdict=cipherdict_passphrased,
+        passphrases=[good_passphrase],
+    )
+    assert len(escrow_api._private_key_cache) == 1
+    assert len(private_key_fetches) == 6
+    escrow_api.decrypt_with_private_key(
+        keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict
+    )
+    assert len(escrow_api._private_key_cache) == 1
+    assert len(private_key_fetches) == 7
+
+
+def test_escrow_api_decryption_parameters_checks():
+
+    escrow_api, _, keychain_uid, _, _, secret, cipherdict, _ = _build_escrow_api_with_rsa_oaep_cipherdicts()
+
+    decrypted = escrow_api.decrypt_with_private_key(
+        keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict
+    )
+    assert decrypted == secret
+
+    with pytest.raises(ValueError, match="Unknown asymmetric cipher"):
+        escrow_api.decrypt_with_private_key(keychain_uid=keychain_uid, encryption_algo="AES_CBC", cipherdict=cipherdict)
+
+    with pytest.raises(AssertionError):  # Passphrases must be given as a list
+        escrow_api.decrypt_with_private_key(
+            keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict, passphrases="abc"
+        )
+
+
+def test_escrow_api_batch_decrypt():
+
+    (
+        escrow_api,
+        private_key_fetches,
+        keychain_uid,
+        keychain_uid_passphrased,
+        good_passphrase,
+        secret,
+        cipherdict,
+        cipherdict_passphrased,
+    ) = _build_escrow_api_with_rsa_oaep_cipherdicts()
+
+    assert escrow_api.batch_decrypt([]) == []
+
+    decryption_requests = [
+        dict(keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict),
+        dict(
+            keychain_uid=keychain_uid_passphrased,
+            encryption_algo="RSA_OAEP",
+            cipherdict=cipherdict_passphrased,
+            passphrases=[good_passphrase],
+        ),
+        dict(keychain_uid=keychain_uid, encryption_algo="RSA_OAEP", cipherdict=cipherdict),
+    ]
+    assert escrow_api.batch_decrypt(decryption_requests) == [secret] * 3
+    assert len(private_key_fetches) == 2  # Thanks to the private key cache
+
+    # Same checks as for single decryptions, even once keys are cached
+    with pytest.raises(AssertionError):
+        escrow_api.batch_decrypt(
+            [
+                dict(
+                    keychain_uid=keychain_uid_passphrased,
+                    encryption_algo="RSA_OAEP",
+                    cipherdict=cipherdict_passphrased,
+                    passphrases="zz" + good_passphrase + "zz",
+                )
+            ]
+        )
+    with pytest.raises(DecryptionError, match="not decrypt"):
+        escrow_api.batch_decrypt(
+            [dict(keychain_uid=keychain_uid_passphrased, encryption_algo="RSA_OAEP", cipherdict=cipherdict_passphrased)]
+        )
+
+    decryption_requests.append(dict(keychain_uid=generate_uuid0(), encryption_algo="RSA_OAEP", cipherdict=cipherdict))
+    with pytest.raises(KeyDoesNotExist, match="not found"):
+        escrow_api.batch_decrypt(decryption_requests)
+
+
+def test_rsa_oaep_decryption_backends_parity():
+
+    pytest.importorskip("cryptography")
+
+    passphrase = "my passphrase"
+    keypair = generate_asymmetric_keypair(key_type="RSA_OAEP", serialize=True, passphrase=passphrase)
+    secret = get_random_bytes(150)  # Several chunks
+
+    public_key = load_asymmetric_key_from_pem_bytestring(key_pem=keypair["public_key"], key_type="RSA_OAEP")
+    cipherdict = _encrypt_via_rsa_oaep(plaintext=secret, key_dict=dict(key=public_key))
+    assert len(cipherdict["digest_list"]) > 1
+
+    for key_loading_function, decryption_function in (
+        (load_asymmetric_key_from_pem_bytestring, _decrypt_via_rsa_oaep),
+        (_load_rsa_private_key_from_pem_with_cryptography, _decrypt_via_rsa_oaep_cryptography),
+    ):
+
+        for wrong_passphrase in (None, "bad passphrase"):
+            with pytest.raises(KeyLoadingError, match="Failed loading RSA_OAEP key"):
+                key_loading_function(key_pem=keypair["private_key"], key_type="RSA_OAEP", passphrase=wrong_passphrase)
+
+        private_key = key_loading_function(key_pem=keypair["private_key"], key_type="RSA_OAEP", passphrase=passphrase)
+
+        decrypted = decryption_function(cipherdict=cipherdict, key_dict=dict(key=private_key))
+        assert decrypted == secret
+
+        # Chunks may be memoryview slices over a single buffer
+        chunk_length = len(cipherdict["digest_list"][0])
+        ciphertext_view = memoryview(b"".join(cipherdict["digest_list"]))
+        cipherdict_views = dict(
+            digest_list=[
+                ciphertext_view[i : i + chunk_length] for i in range(0, len(ciphertext_view), chunk_length)
+            ]
+        )
+        decrypted = decryption_function(cipherdict=cipherdict_views, key_dict=dict(key=private_key))
+        assert decrypted == secret
+
+        wrong_cipherdict = copy.deepcopy(cipherdict)
+        wrong_cipherdict["digest_list"].append(b"aaabbbccc")
+        with pytest.raises(ValueError, match="Ciphertext with incorrect length"):
+            decryption_function(cipherdict=wrong_cipherdict, key_dict=dict(key=private_key))
+
+        wrong_cipherdict = copy.deepcopy(cipherdict)
+        first_chunk = wrong_cipherdict["digest_list"][0]
+        wrong_cipherdict["digest_list"][0] = first_chunk[:-1] + bytes([first_chunk[-1] ^ 0xFF])
+        with pytest.raises(ValueError, match="Incorrect decryption"):
+            decryption_function(cipherdict=wrong_cipherdict, key_dict=dict(key=private_key))
+
+
 def test_generate_free_keypair_for_least_provisioned_key_type():
 
     generated_keys_count = 0
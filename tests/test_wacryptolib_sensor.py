@@ -5,6 +5,7 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timezone
 from datetime import timedelta
 
+import pytest
 from freezegun import freeze_time
 
 from _test_mockups import FakeTestContainerStorage
@@ -182,14 +183,26 @@ def test_tarfile_aggregator(tmp_path):
 
         assert len(container_storage) == 4
 
-        # We tests conflicts between identifical tar record names
-        for i in range(3):  # Three times the same file name!
+        # Non-contiguous memoryviews are rejected, without breaking the aggregator
+        with pytest.raises(AssertionError):
             tarfile_aggregator.add_record(
                 sensor_name="smartphone_recorder",
                 from_datetime=datetime(year=2017, month=10, day=11, tzinfo=timezone.utc),
                 to_datetime=datetime(year=2017, month=12, day=1, tzinfo=timezone.utc),
                 extension=".mp3",
-                data=bytes([i] * 500),
+                data=memoryview(bytes(1000))[::2],
+            )
+        assert len(tarfile_aggregator) == 0
+        assert not tarfile_aggregator._current_start_time
+
+        # We tests conflicts between identifical tar record names, and all supported bytes-like types
+        for i, data_type in enumerate((bytes, bytearray, memoryview)):  # Three times the same file name!
+            tarfile_aggregator.add_record(
+                sensor_name="smartphone_recorder",
+                from_datetime=datetime(year=2017, month=10, day=11, tzinfo=timezone.utc),
+                to_datetime=datetime(year=2017, month=12, day=1, tzinfo=timezone.utc),
+                extension=".mp3",
+                data=data_type(bytes([i] * 500)),
             )
 
         frozen_datetime.tick(delta=timedelta(seconds=1))